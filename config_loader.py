@@ -1,9 +1,17 @@
 import json
+from collections import ChainMap
+import mmap
 import os
 import sys
 import logging
 from pathlib import Path
-from typing import Dict, Any, Optional, TypeVar, Type
+from types import MappingProxyType
+from typing import Dict, Any, Mapping, TypeVar
+
+try:
+    import orjson
+except ImportError:  # orjson is optional; fall back to the stdlib parser
+    orjson = None
 
 T = TypeVar('T')
 
@@ -36,15 +44,86 @@ CONFIG_SCHEMA = {
         "default": True,
         "env_var": "ROO_AUTO_DETECT_MAIN",
         "description": "Whether to automatically detect main file"
+    },
+    "clone_cache_max_entries": {
+        "type": int,
+        "required": True,
+        "default": 8,
+        "env_var": "ROO_CLONE_CACHE_MAX_ENTRIES",
+        "description": "Maximum number of cached repository clones to keep"
     }
 }
 
+def _coerce_bool(value: Any) -> bool:
+    """Coerce a config value to bool (environment variables are strings)."""
+    if isinstance(value, str):
+        return value.lower() in ('true', '1', 'yes', 'on')
+    return bool(value)
+
+def _coerce_str(value: Any) -> str:
+    """Coerce a config value to an interned str for cheap equality checks."""
+    return sys.intern(str(value))
+
+def _make_coercer(expected_type: type):
+    """Return a converter specialized for a schema type."""
+    if expected_type is bool:
+        return _coerce_bool
+    if expected_type is str:
+        return _coerce_str
+    # int() already handles numeric strings and plain values
+    return expected_type
+
+# Bind each schema entry's converter once instead of dispatching per value
+for _schema in CONFIG_SCHEMA.values():
+    _schema["_coerce"] = _make_coercer(_schema["type"])
+del _schema
+
+# Defaults and a flattened view of the schema, built once at import
+# Canonical default env section; never mutated, only copied when a source overrides it
+_DEFAULT_ENV: Dict[str, Dict[str, Any]] = {
+    "github": {"GITHUB_PERSONAL_ACCESS_TOKEN": None, "HOST": "github.com"},
+    "gitlab": {"GITLAB_PERSONAL_ACCESS_TOKEN": None, "HOST": "gitlab.com"}
+}
+_DEFAULT_CONFIG: Dict[str, Any] = {key: schema["default"] for key, schema in CONFIG_SCHEMA.items()}
+_DEFAULT_CONFIG["env"] = _DEFAULT_ENV
+# (key, type, coerce, required, default, env_var) for each schema entry
+_SCHEMA_ITEMS = tuple(
+    (key, schema["type"], schema["_coerce"], schema["required"], schema["default"], schema.get("env_var"))
+    for key, schema in CONFIG_SCHEMA.items()
+)
+# (config_key, env_var) for each schema entry that can be set from the environment
+_ENV_LOOKUPS = tuple(
+    (key, schema["env_var"]) for key, schema in CONFIG_SCHEMA.items() if schema.get("env_var")
+)
+
+# The home directory does not change within a process, so resolve it once
+_USER_CFG_PATH = Path.home() / ".roo" / "config.json"
+
+# Merged configurations keyed on config file mtimes and relevant env vars
+_CONFIG_CACHE: Dict[tuple, Mapping[str, Any]] = {}
+
 class ConfigurationError(Exception):
     """Custom exception for configuration-related errors."""
     pass
 
+def _load_json_file(path: Path) -> Any:
+    """Parse a JSON file as bytes, using orjson over an mmap when it is available."""
+    with open(path, "rb") as f:
+        # mmap rejects empty files, and stdlib json cannot parse a memoryview
+        if orjson is None or os.fstat(f.fileno()).st_size == 0:
+            raw = f.read()
+            return orjson.loads(raw) if orjson is not None else json.loads(raw)
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            with memoryview(mm) as view:
+                return orjson.loads(view)
+
 def validate_config_value(key: str, value: Any, schema_entry: Dict[str, Any]) -> Any:
-    """Validate a configuration value against its schema definition."""
+    """
+    Validate a configuration value against its schema definition.
+
+    load_roo_config validates inline and no longer calls this; it is kept
+    only as public API.
+    """
     if value is None:
         if schema_entry["required"]:
             raise ConfigurationError(f"Required configuration '{key}' is missing")
@@ -52,47 +131,42 @@ def validate_config_value(key: str, value: Any, schema_entry: Dict[str, Any]) ->
 
     expected_type = schema_entry["type"]
     try:
-        # Handle boolean special case (environment variables are strings)
-        if expected_type == bool and isinstance(value, str):
-            return value.lower() in ('true', '1', 'yes', 'on')
-        # Handle integer special case
-        if expected_type == int and isinstance(value, str):
-            return int(value)
-        # Normal type conversion
-        return expected_type(value)
+        return schema_entry["_coerce"](value)
     except (ValueError, TypeError):
         raise ConfigurationError(
             f"Invalid type for configuration '{key}'. Expected {expected_type.__name__}, got {type(value).__name__}"
         )
 
-def get_config_from_env(schema_entry: Dict[str, Any]) -> Optional[Any]:
-    """Get configuration value from environment variable if available."""
-    env_var = schema_entry.get("env_var")
-    if env_var and env_var in os.environ:
-        return os.environ[env_var]
-    return None
-
 def validate_env_config(config: Dict[str, Dict[str, Any]]) -> None:
     """Validate the environment configuration section."""
-    if not isinstance(config.get("env"), dict):
+    env = config.get("env")
+    if type(env) is not dict:
         raise ConfigurationError("'env' configuration must be a dictionary")
-    
-    for service, settings in config["env"].items():
-        if not isinstance(settings, dict):
-            raise ConfigurationError(f"Environment settings for '{service}' must be a dictionary")
-        
-        # Validate required fields for each service
-        if service == "github":
-            token = settings.get("GITHUB_PERSONAL_ACCESS_TOKEN")
-            if token and not isinstance(token, str):
-                raise ConfigurationError("GitHub personal access token must be a string")
-        elif service == "gitlab":
-            token = settings.get("GITLAB_PERSONAL_ACCESS_TOKEN")
-            if token and not isinstance(token, str):
-                raise ConfigurationError("GitLab personal access token must be a string")
+
+    # Only github and gitlab are recognized, so check them directly
+    github = env.get("github")
+    if github is not None:
+        if type(github) is not dict:
+            raise ConfigurationError("Environment settings for 'github' must be a dictionary")
+        token = github.get("GITHUB_PERSONAL_ACCESS_TOKEN")
+        if token and type(token) is not str:
+            raise ConfigurationError("GitHub personal access token must be a string")
+
+    gitlab = env.get("gitlab")
+    if gitlab is not None:
+        if type(gitlab) is not dict:
+            raise ConfigurationError("Environment settings for 'gitlab' must be a dictionary")
+        token = gitlab.get("GITLAB_PERSONAL_ACCESS_TOKEN")
+        if token and type(token) is not str:
+            raise ConfigurationError("GitLab personal access token must be a string")
 
 def merge_configs(*configs: Dict[str, Any]) -> Dict[str, Any]:
-    """Merge multiple configuration dictionaries, later ones taking precedence."""
+    """
+    Merge multiple configuration dictionaries, later ones taking precedence.
+
+    load_roo_config layers its sources itself and no longer calls this; it
+    is kept only as public API, with its original semantics.
+    """
     result = {}
     for config in configs:
         if not isinstance(config, dict):
@@ -100,13 +174,24 @@ def merge_configs(*configs: Dict[str, Any]) -> Dict[str, Any]:
         
         # Handle environment variables section specially
         if "env" in config and "env" in result:
+            merged_env = result["env"]
             for group, envs in config["env"].items():
                 if isinstance(envs, dict):
-                    result["env"].setdefault(group, {}).update(envs)
+                    if group in merged_env:
+                        merged_env[group].update(envs)
+                    else:
+                        merged_env[group] = dict(envs)
         else:
             result.update(config)
     return result
 
+def _stat_mtime_ns(path: Path) -> int:
+    """Return the mtime of a path in nanoseconds, or 0 if it cannot be stat'ed."""
+    try:
+        return os.stat(path).st_mtime_ns
+    except OSError:
+        return 0
+
 def load_roo_config() -> Dict[str, Any]:
     """
     Load and validate Roo configuration from multiple sources.
@@ -117,77 +202,135 @@ def load_roo_config() -> Dict[str, Any]:
     3. User-level config (~/.roo/config.json)
     4. Default values
 
+    Results are memoized on the config files' mtimes and the relevant
+    environment variables, so repeated calls skip parsing and validation.
+    The cached configuration is kept read-only; each caller gets its own
+    plain dict copy (the top level and every env group), so mutating the
+    result is safe.
+
     Returns:
         Dict[str, Any]: Validated configuration dictionary
     
     Raises:
         ConfigurationError: If configuration is invalid
     """
-    # Default configuration values
-    default_config = {
-        key: schema["default"]
-        for key, schema in CONFIG_SCHEMA.items()
-    }
-    default_config["env"] = {
-        "github": {"GITHUB_PERSONAL_ACCESS_TOKEN": None, "HOST": "github.com"},
-        "gitlab": {"GITLAB_PERSONAL_ACCESS_TOKEN": None, "HOST": "gitlab.com"}
-    }
+    user_config_path = _USER_CFG_PATH
+    cwd = Path.cwd()
+    project_config_path = cwd / ".roo" / "config.json"
+    cache_key = (
+        str(user_config_path), _stat_mtime_ns(user_config_path),
+        str(project_config_path), _stat_mtime_ns(project_config_path),
+        tuple(os.environ.get(env_var) for _, env_var in _ENV_LOOKUPS),
+    )
+
+    cached = _CONFIG_CACHE.get(cache_key)
+    if cached is None:
+        cached = _freeze_config(_build_roo_config(user_config_path, project_config_path))
+        _CONFIG_CACHE[cache_key] = cached
+    return _thaw_config(cached)
 
-    config_sources = []
+def _freeze_config(config: Dict[str, Any]) -> Mapping[str, Any]:
+    """Wrap a merged configuration in read-only views so it can be shared safely."""
+    frozen = dict(config)
+    frozen["env"] = MappingProxyType(
+        {group: MappingProxyType(dict(envs)) for group, envs in config["env"].items()}
+    )
+    return MappingProxyType(frozen)
+
+def _thaw_config(frozen: Mapping[str, Any]) -> Dict[str, Any]:
+    """
+    Copy a cached configuration into plain dicts. Every value is a scalar
+    apart from the two-level env section, so this is a full copy at a
+    fraction of the cost of deepcopy.
+    """
+    config = dict(frozen)
+    config["env"] = {group: dict(envs) for group, envs in frozen["env"].items()}
+    return config
+
+def _build_roo_config(user_config_path: Path, project_config_path: Path) -> Dict[str, Any]:
+    """Load, merge and validate the configuration sources without caching."""
+    user_raw: Dict[str, Any] = {}
+    project_raw: Dict[str, Any] = {}
 
     # Load user configuration
-    user_config_path = Path.home() / ".roo" / "config.json"
-    if user_config_path.exists() and user_config_path.is_file():
-        try:
-            with open(user_config_path, "r", encoding='utf-8') as f:
-                user_config = json.load(f)
-                if isinstance(user_config, dict):
-                    config_sources.append(user_config)
-                else:
-                    logging.warning(f"User config file {user_config_path} is not a valid JSON object")
-        except Exception as e:
-            logging.warning(f"Failed to load user config {user_config_path}: {e}")
+    try:
+        user_config = _load_json_file(user_config_path)
+        if type(user_config) is dict:
+            user_raw = user_config
+        else:
+            logging.warning(f"User config file {user_config_path} is not a valid JSON object")
+    except (FileNotFoundError, IsADirectoryError):
+        pass  # No user config present
+    except Exception as e:
+        logging.warning(f"Failed to load user config {user_config_path}: {e}")
 
     # Load project configuration
-    project_config_path = Path.cwd() / ".roo" / "config.json"
-    if project_config_path.exists() and project_config_path.is_file():
-        try:
-            with open(project_config_path, "r", encoding='utf-8') as f:
-                project_config = json.load(f)
-                if isinstance(project_config, dict):
-                    config_sources.append(project_config)
-                else:
-                    logging.warning(f"Project config file {project_config_path} is not a valid JSON object")
-        except Exception as e:
-            logging.warning(f"Failed to load project config {project_config_path}: {e}")
-
-    # Merge configurations
-    merged_config = merge_configs(default_config, *config_sources)
-
-    # Validate and apply environment variables
-    for key, schema in CONFIG_SCHEMA.items():
-        env_value = get_config_from_env(schema)
-        if env_value is not None:
-            merged_config[key] = env_value
+    try:
+        project_config = _load_json_file(project_config_path)
+        if type(project_config) is dict:
+            project_raw = project_config
+        else:
+            logging.warning(f"Project config file {project_config_path} is not a valid JSON object")
+    except (FileNotFoundError, IsADirectoryError):
+        pass  # No project config present
+    except Exception as e:
+        logging.warning(f"Failed to load project config {project_config_path}: {e}")
+
+    # Overlay the sources without copying them: project > user > default
+    layered = ChainMap(project_raw, user_raw, _DEFAULT_CONFIG)
 
-        # Validate each config value
+    # Resolve, coerce and validate each scalar in one pass; an environment
+    # variable takes priority over every file-based layer
+    merged_config: Dict[str, Any] = {}
+    for key, expected_type, coerce, required, default, env_var in _SCHEMA_ITEMS:
+        value = os.environ.get(env_var) if env_var else None
+        if value is None:
+            value = layered.get(key)
+        if value is None:
+            if required and default is None:
+                logging.error(f"Configuration error: Required configuration '{key}' is missing")
+            merged_config[key] = default
+            continue
         try:
-            merged_config[key] = validate_config_value(key, merged_config.get(key), schema)
-        except ConfigurationError as e:
-            logging.error(f"Configuration error: {e}")
-            merged_config[key] = schema["default"]
+            merged_config[key] = coerce(value)
+        except (ValueError, TypeError):
+            logging.error(
+                f"Configuration error: Invalid type for configuration '{key}'. "
+                f"Expected {expected_type.__name__}, got {type(value).__name__}"
+            )
+            merged_config[key] = default
+
+    # The env section is structural, so build it with one two-level
+    # comprehension over the layers. The defaults can be shared when nothing
+    # overrides them: load_roo_config only hands out copies.
+    env_sources = [src["env"] for src in (user_raw, project_raw) if isinstance(src.get("env"), dict)]
+    if env_sources:
+        env_layers = (_DEFAULT_ENV, *env_sources)
+        groups = dict.fromkeys(
+            group for layer in env_layers for group, envs in layer.items() if isinstance(envs, dict)
+        )
+        merged_config["env"] = {
+            sys.intern(group): {
+                name: value
+                for layer in env_layers if isinstance(layer.get(group), dict)
+                for name, value in layer[group].items()
+            }
+            for group in groups
+        }
+    else:
+        merged_config["env"] = _DEFAULT_ENV
 
     # Validate environment configuration
     try:
         validate_env_config(merged_config)
     except ConfigurationError as e:
         logging.error(f"Environment configuration error: {e}")
-        merged_config["env"] = default_config["env"]
+        merged_config["env"] = _DEFAULT_ENV
 
     return merged_config
 
-def get_config_docs() -> str:
-    """Generate documentation for all configuration options."""
+def _build_docs_lines() -> list:
+    """Build the documentation lines for all configuration options."""
     docs = ["Roo Configuration Options", "======================", ""]
     
     for key, schema in CONFIG_SCHEMA.items():
@@ -200,4 +343,11 @@ def get_config_docs() -> str:
             docs.append(f"Environment Variable: {schema['env_var']}")
         docs.append("")
 
-    return "\n".join(docs)
\ No newline at end of file
+    return docs
+
+# CONFIG_SCHEMA is static, so the docs only need rendering once
+_CONFIG_DOCS = "\n".join(_build_docs_lines())
+
+def get_config_docs() -> str:
+    """Generate documentation for all configuration options."""
+    return _CONFIG_DOCS
@@ -1,7 +1,9 @@
+import atexit
 import logging
+import queue
 import sys
 from pathlib import Path
-from logging.handlers import RotatingFileHandler
+from logging.handlers import RotatingFileHandler, QueueHandler, QueueListener
 import os
 
 # Define constants for logging
@@ -10,14 +12,53 @@ LOG_FILE = LOG_DIR / "roo.log"
 MAX_LOG_SIZE = 10 * 1024 * 1024  # 10 MB
 BACKUP_COUNT = 5  # Keep 5 backup files
 
+# Background listener that writes queued records to the log file
+_queue_listener = None
+_queue_handler = None
+
+def _stop_queue_listener():
+    """Flush queued records and close the listener's handlers."""
+    global _queue_listener
+    if _queue_listener is not None:
+        _queue_listener.stop()
+        for handler in _queue_listener.handlers:
+            handler.close()
+        _queue_listener = None
+
+atexit.register(_stop_queue_listener)
+
+class _CachedTimeFormatter(logging.Formatter):
+    """Formatter that reuses the rendered asctime for records in the same second.
+
+    Only valid for a datefmt without sub-second fields; the default format
+    (which appends milliseconds) is never cached.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._last_time = (None, None)  # (whole second, formatted string)
+
+    def formatTime(self, record, datefmt=None):
+        if datefmt is None:
+            return super().formatTime(record, datefmt)
+        second = int(record.created)
+        cached_second, cached_str = self._last_time
+        if second == cached_second:
+            return cached_str
+        formatted = super().formatTime(record, datefmt)
+        self._last_time = (second, formatted)
+        return formatted
+
 def configure_logging(debug: bool = False):
     """
     Sets up logging configuration with rotation and formatting.
-    Creates log directory if it doesn't exist.
+    Creates log directory if it doesn't exist. File writes happen on a
+    QueueListener thread so logging callers only pay for a queue put.
     
     Args:
         debug (bool): If True, sets logging level to DEBUG and enables console output
     """
+    global _queue_handler, _queue_listener
     try:
         # Create log directory if it doesn't exist
         os.makedirs(LOG_DIR, exist_ok=True)
@@ -27,11 +68,12 @@ def configure_logging(debug: bool = False):
             filename=str(LOG_FILE),
             maxBytes=MAX_LOG_SIZE,
             backupCount=BACKUP_COUNT,
-            encoding='utf-8'
+            encoding='utf-8',
+            delay=True  # Defer opening the log file until the first record is emitted
         )
         
         # Define formatter
-        formatter = logging.Formatter(
+        formatter = _CachedTimeFormatter(
             '%(asctime)s - %(levelname)s - %(filename)s:%(lineno)d - %(funcName)s - %(message)s',
             datefmt='%Y-%m-%d %H:%M:%S'
         )
@@ -49,11 +91,23 @@ def configure_logging(debug: bool = False):
         file_handler.setLevel(logging.DEBUG if debug else logging.INFO)
         console_handler.setLevel(logging.DEBUG if debug else logging.INFO)
         
-        root_logger.addHandler(file_handler)
+        # Replace the listener from any previous call so records aren't written twice
+        if _queue_handler is not None:
+            root_logger.removeHandler(_queue_handler)
+        _stop_queue_listener()
+
+        # Route records through a queue; the listener owns the file handler
+        log_queue = queue.SimpleQueue()
+        _queue_handler = QueueHandler(log_queue)
+        _queue_listener = QueueListener(log_queue, file_handler, respect_handler_level=True)
+        _queue_listener.start()
+        root_logger.addHandler(_queue_handler)
         # Do not add console handler by default to suppress initial messages
         # root_logger.addHandler(console_handler)
         
-        logging.info("Logging system initialized") # This will now only go to the file
+        if debug:
+            # Only log this in debug mode so the deferred file open isn't forced on every run
+            logging.debug("Logging system initialized")
     except Exception as e:
         print(f"Failed to configure logging: {e}", file=sys.stderr)
         # Set up basic logging as fallback
@@ -62,24 +116,29 @@ def configure_logging(debug: bool = False):
             format='%(asctime)s - %(levelname)s - %(message)s'
         )
 
+# Map level names accepted by log_event to numeric logging levels
+_LEVEL_NO = {
+    'debug': logging.DEBUG,
+    'info': logging.INFO,
+    'warning': logging.WARNING,
+    'error': logging.ERROR,
+    'critical': logging.CRITICAL,
+}
+
 def log_event(message: str, level: str = 'info', print_to_console: bool = False) -> None:
     """Logs a message with a specified log level."""
-    try:
-        # Log the message with the appropriate level
-        if level == 'debug':
-            logging.debug(message)
-        elif level == 'info':
-            logging.info(message)
-        elif level == 'warning':
-            logging.warning(message)
-        elif level == 'error':
-            logging.error(message)
-        elif level == 'critical':
-            logging.critical(message)
-        
-        # Optionally print to console
-        if print_to_console:
-            print(f"[{level.upper()}] {message}", file=sys.stderr)
-    except Exception as e:
-        # Handle logging failures
-        print(f"CRITICAL LOGGING ERROR: {e} | Original message: {message}", file=sys.stderr)
\ No newline at end of file
+    # Log the message with the appropriate level, skipping the LogRecord
+    # entirely when the root logger would filter it out. Unknown levels are
+    # not logged at all.
+    lvl_no = _LEVEL_NO.get(level)
+    root = logging.getLogger()
+    if lvl_no is not None and root.isEnabledFor(lvl_no):
+        try:
+            root.log(lvl_no, message)
+        except Exception as e:
+            # Handle logging failures
+            print(f"CRITICAL LOGGING ERROR: {e} | Original message: {message}", file=sys.stderr)
+
+    # Optionally print to console
+    if print_to_console:
+        print(f"[{level.upper()}] {message}", file=sys.stderr)
\ No newline at end of file